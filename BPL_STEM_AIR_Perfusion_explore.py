@@ -1,583 +1,1152 @@
 # Figure - Simulation of perfusion reactor with STEM culture
-#          with functions added to facilitate explorative simulation work 
+#          with functions added to facilitate explorative simulation work
 #
 # Author: Jan Peter Axelsson
 #------------------------------------------------------------------------------------------------------------------
 # 2024-08-31 - Created
 # 2024-09-11 - Changed name of FMU
 # 2024-10-03 - Changed name of FMU
+# 2026-08-30 - Replaced eval() of command strings in diagrams with closures called by show() and simu()
+# 2026-08-30 - Batched parameter setting in simu() through cached value references and set_real()
+# 2026-08-30 - Fast path for simu() in cont mode that skips reset() and only sets changed parameters
+# 2026-08-30 - Batch-extract needed trajectories once after simulation and use in-memory result handling
+# 2026-08-30 - Downsample long trajectories with LTTB (min-max for step curves) before plotting
+# 2026-08-30 - Rasterize dense time-series lines above a threshold set by newplot()
+# 2026-08-30 - Memoized describe_parts() and simplified the component name extraction
+# 2026-08-30 - disp() now uses a precomputed reverse parameter map and one batched get_real() call
+# 2026-08-30 - Added sweep() for parallel parameter sweeps with one FMU per worker process
+# 2026-08-30 - Pin the CVode tolerances in the ME options profile
+# 2026-08-30 - Added optional simu(backend='numba') with the reactor equations jitted and solve_ivp
+# 2026-08-30 - Gathered the global state in class STEMSession - module functions wrap a default session
+# 2026-08-30 - Precompute the state-to-start-name table once and batch the cont re-initialization
+# 2026-08-30 - Added save_checkpoint()/load_checkpoint() of state and parameters to HDF5 for restart
+# 2026-08-30 - Cache variable descriptions, units and value references for describe() lookups
+# 2026-08-30 - Precompute the derived series qL_net and OUR once instead of inside the plot closures
+# 2026-08-30 - Let CVode output its natural step points (ncp=0) for ME and resample for plotting
+# 2026-08-30 - Replaced the itertools.cycle line cycler with an indexed plot counter on the session
+# 2026-08-30 - Precompile the parCheck requirements and check par() keys against a frozenset
+# 2026-08-30 - Import matplotlib and zipfile lazily in newplot() and process_diagram()
+# 2026-08-30 - Collect axes grid and label setup in newplot() into a data-driven helper
 #------------------------------------------------------------------------------------------------------------------
 
 # Setup framework
 import sys
 import platform
 import locale
-import numpy as np 
-import matplotlib.pyplot as plt 
-import matplotlib.image as img
-import zipfile 
+import numpy as np
 
 from pyfmi import load_fmu
 from pyfmi.fmi import FMUException
 
-from itertools import cycle
 from importlib_metadata import version   # included in future Python 3.8
 
 # Set the environment - for Linux a JSON-file in the FMU is read
 if platform.system() == 'Linux': locale.setlocale(locale.LC_ALL, 'en_US.UTF-8')
 
 #------------------------------------------------------------------------------------------------------------------
-#  Setup application FMU
+#  General helper functions without state
+FMU_explore = 'FMU-explore version 1.0.0'
 #------------------------------------------------------------------------------------------------------------------
 
-# Provde the right FMU and load for different platforms in user dialogue:
-global fmu_model, model
-if platform.system() == 'Windows':
-   print('Windows - run FMU pre-compiled JModelica 2.14')
-   flag_vendor = 'JM'
-   flag_type = 'CS'
-   fmu_model ='BPL_STEM_AIR_Perfusion_windows_jm_cs.fmu'        
-   model = load_fmu(fmu_model, log_level=0)  
-elif platform.system() == 'Linux':  
-   flag_vendor = 'OM'
-   flag_type = 'ME'
-   if flag_vendor in ['OM','om']:
-      print('Linux - run FMU pre-compiled OpenModelica') 
-      if flag_type in ['CS','cs']:         
-         fmu_model ='BPL_STEM_AIR_Perfusion_linux_om_cs.fmu'    
-         model = load_fmu(fmu_model, log_level=0) 
-      if flag_type in ['ME','me']:         
-         fmu_model = 'BPL_STEM_AIR_Reactor_linux_om_me.fmu'     
-         model = load_fmu(fmu_model, log_level=0)
-   else:    
-      print('There is no FMU for this platform')
-
-# Provide various opts-profiles
-if flag_type in ['CS', 'cs']:
-   opts_std = model.simulate_options()
-   opts_std['silent_mode'] = True
-   opts_std['ncp'] = 500 
-   opts_std['result_handling'] = 'binary'     
-elif flag_type in ['ME', 'me']:
-   opts_std = model.simulate_options()
-   opts_std["CVode_options"]["verbosity"] = 50 
-   opts_std['ncp'] = 500 
-   opts_std['result_handling'] = 'binary'  
-else:    
-   print('There is no FMU for this platform')
-  
-# Provide various MSL and BPL versions
-if flag_vendor in ['JM', 'jm', 'OM', 'om']:
-   MSL_usage = '3.2.3 - used components: RealInput, RealOutput, CombiTimeTable, Types' 
-   MSL_version = '3.2.3'
-   BPL_version = 'BPL - not used' 
-
-# Simulation time
-global simulationTime; simulationTime = 1000.0
-global prevFinalTime; prevFinalTime = 0
-
-# Dictionary of time discrete states
-timeDiscreteStates = {} 
-
-# Define a minimal compoent list of the model as a starting point for describe('parts')
-component_list_minimum = ['bioreactor', 'bioreactor.culture']
-
-# Define process_diagram
-fmu_process_diagram = 'BPL_GUI_STEM_Perfusion_process_diagram_om.png'
-
-
-#------------------------------------------------------------------------------------------------------------------
-#  Specific application constructs: stateDict, parDict, diagrams, newplot(), describe()
-#------------------------------------------------------------------------------------------------------------------
-   
-# Create stateDict that later will be used to store final state and used for initialization in 'cont':
-global stateDict; stateDict =  {}
-stateDict = model.get_states_list()
-stateDict.update(timeDiscreteStates)
-
-# Create parDict
-global parDict; parDict = {}
-parDict['Vcc'] = 0.040                # L
-parDict['N_start'] = 50               # 1E6 
-parDict['DO_start'] = 100             # mg/L
-parDict['qm'] = 1.0e-6                # mg/(h*1E6)
-parDict['Yns'] = 0.013                # mg/1E6
-parDict['qLpmax'] = 0.008             #
-parDict['scale'] = 1000.0             # Correction of L equation Vcc
-parDict['CL0'] = 8.0                  # mg/L
-parDict['OTR'] = 21                   # mg/h  
-
-global parLocation; parLocation = {}
-parLocation['Vcc'] = 'Vcc'
-parLocation['N_start'] = 'N_start'
-parLocation['DO_start'] = 'DO_start'
-parLocation['qm'] = 'qm'
-parLocation['Yns'] = 'Yns'
-parLocation['qLpmax'] = 'qLpmax'
-parLocation['scale'] = 'scale'
-parLocation['CL0'] = 'CL0'
-parLocation['OTR'] = 'OTR'
-
-# Parameter value check - especially for hysteresis to avoid runtime error
-global parCheck; parCheck = []
-
-# Create list of diagrams to be plotted by simu()
-global diagrams
-diagrams = []
-
-def newplot(title='Stem cell perfusion cultivation', plotType='TimeSeries'):
-   """ Standard plot window,
-        title = '' """
-    
-   # Transfer of argument to global variable
-   global ax1, ax2, ax3, ax4, ax5, ax6
-   global ax11, ax21, ax31, ax41, ax51
-   global ax12, ax22, ax32, ax42, ax52
-   
-   # Reset pens
-   setLines()
-       
-   # Plot diagram 
-   if plotType == 'Basic':
-      
-      plt.figure()
-      ax1 = plt.subplot(6,1,1)
-      ax2 = plt.subplot(6,1,2)
-      ax3 = plt.subplot(6,1,3)
-      ax4 = plt.subplot(6,1,4)
-      ax5 = plt.subplot(6,1,5)
-      ax6 = plt.subplot(6,1,6)
-
-      ax1.set_title(title)
-      ax1.grid()
-      ax1.set_ylabel('N [1E6]')
-            
-      ax2.grid()
-      ax2.set_ylabel('G [g/L]')
-
-      ax3.grid()
-      ax3.set_ylabel('L [g/L]')
-      
-      ax4.grid()
-      ax4.set_ylabel('DO [mg/L]')
-      
-      ax5.grid()
-      ax5.set_ylabel('Vcc [L]')
-
-      ax6.grid()
-      ax6.set_ylabel('F [L/h]')
-      ax6.set_xlabel('Time [h]')
-        
-      # List of commands to be executed by simu() after a simulation  
-      diagrams.clear()
-      diagrams.append("ax1.plot(t,sim_res['N'], color='b', linestyle=linetype)")       
-      diagrams.append("ax2.plot(t,sim_res['G'], color='b', linestyle=linetype)")  
-      diagrams.append("ax2.set_ylim(0)") 
-      diagrams.append("ax3.plot(t,sim_res['L'], color='b', linestyle=linetype)")  
-      diagrams.append("ax4.plot(t,sim_res['DO'], color='b', linestyle=linetype)")  
-      diagrams.append("ax4.set_ylim(0)") 
-      diagrams.append("ax5.plot(t,sim_res['Vcc'], color='b', linestyle=linetype)")  
-      diagrams.append("ax5.set_ylim([0, 0.050])")    
-      diagrams.append("ax6.step(t,sim_res['F'], color='b', linestyle=linetype)") 
+def dict_reverser(d):
+   seen = set()
+   return {v: k for k, v in d.items() if v not in seen or seen.add(v)}
 
-   elif plotType == 'Comprehensive':
+# Downsampling of long trajectories before they are handed to Matplotlib
+def _downsample_lttb(t, y, target):
+   """Largest-Triangle-Three-Buckets downsampling of (t,y) to about target points"""
+   n = len(t)
+   edges = np.linspace(1, n-1, target-1).astype(np.int64)
+   index = np.empty(target, dtype=np.int64)
+   index[0] = 0; index[-1] = n-1
+   a = 0
+   for i in range(target-2):
+      lo = edges[i]; hi = max(edges[i+1], edges[i]+1)
+      # The average of the following bucket is the third corner of the triangle
+      if i < target-3:
+         avg_t = t[edges[i+1]:edges[i+2]+1].mean(); avg_y = y[edges[i+1]:edges[i+2]+1].mean()
+      else:
+         avg_t = t[n-1]; avg_y = y[n-1]
+      area = np.abs((t[a]-avg_t)*(y[lo:hi]-y[a]) - (t[a]-t[lo:hi])*(avg_y-y[a]))
+      a = lo + int(np.argmax(area))
+      index[i+1] = a
+   return t[index], y[index]
 
-      plt.figure()
-      ax11 = plt.subplot(5,2,1); ax12 = plt.subplot(5,2,2)
-      ax21 = plt.subplot(5,2,3); ax22 = plt.subplot(5,2,4)
-      ax31 = plt.subplot(5,2,5); ax32 = plt.subplot(5,2,6)
-      ax41 = plt.subplot(5,2,7); ax42 = plt.subplot(5,2,8)
-      ax51 = plt.subplot(5,2,9); ax52 = plt.subplot(5,2,10)
-
-      ax11.set_title(title)
-      ax11.grid()
-      ax11.set_ylabel('N [1E6]')
-
-      ax21.grid()
-      ax21.set_ylabel('G [g/L]')
-
-      ax31.grid()
-      ax31.set_ylabel('L [g/L]')
-      
-      ax41.grid()
-      ax41.set_ylabel('DO [mg/L]')
-
-      ax51.grid()
-      ax51.set_ylabel('F [L/h]')
-      ax51.set_xlabel('Time [h]')
-
-      ax12.grid()
-      ax12.set_ylabel('qN [1/h]')
-      
-      ax22.grid()
-      ax22.set_ylabel('qG [g/(h*1E6)]')
-
-      ax32.grid()
-      ax32.set_ylabel('qL [g/(h*1E6)]')
-
-      ax42.grid()
-      ax42.set_ylabel('qO2 [mg/(h*1E6)]')
-
-      ax52.grid()
-      ax52.set_ylabel('OUR [mg/h]')
-      ax52.set_xlabel('Time [h]')
-
-
-      # List of commands to be executed by simu() after a simulation  
-      diagrams.clear()
-      diagrams.append("ax11.plot(t,sim_res['N'], color='b', linestyle=linetype)")       
-      diagrams.append("ax21.plot(t,sim_res['G'], color='b', linestyle=linetype)")  
-      diagrams.append("ax21.set_ylim(0)") 
-      diagrams.append("ax31.plot(t,sim_res['L'], color='b', linestyle=linetype)")  
-      diagrams.append("ax41.plot(t,sim_res['DO'], color='b', linestyle=linetype)")  
-      diagrams.append("ax41.set_ylim(0)")     
-      diagrams.append("ax51.step(t,sim_res['F'], color='b', linestyle=linetype)")       
-
-      diagrams.append("ax12.plot(t,sim_res['qN'], color='b', linestyle=linetype)") 
-      diagrams.append("ax12.step(t,sim_res['qNmax'], color='r', linestyle=linetype)") 
-      diagrams.append("ax22.plot(t,sim_res['qG'], color='b', linestyle=linetype)") 
-      diagrams.append("ax32.plot(t,sim_res['qLp']-sim_res['qLc'], color='b', linestyle=linetype)") 
-      diagrams.append("ax32.plot(t,sim_res['qLp'], color='g', linestyle=linetype)") 
-      diagrams.append("ax32.step(t,sim_res['qLc'], color='r', linestyle=linetype)") 
-      diagrams.append("ax42.step(t,sim_res['qO2'], color='r', linestyle=linetype)") 
-      diagrams.append("ax52.plot(t,sim_res['N']*sim_res['qO2'], color='b', linestyle=linetype)") 
-             
-def describe(name, decimals=3):
-   """Look up description of culture, media, as well as parameters and variables in the model code"""
+def _downsample_minmax(t, y, target):
+   """Min-max bucket downsampling of (t,y) - keeps the corners of step curves"""
+   n = len(t)
+   edges = np.linspace(0, n, target//2 + 1).astype(np.int64)
+   index = [0, n-1]
+   for lo, hi in zip(edges[:-1], edges[1:]):
+      if hi > lo:
+         index.append(lo + int(np.argmin(y[lo:hi])))
+         index.append(lo + int(np.argmax(y[lo:hi])))
+   index = np.unique(index)
+   return t[index], y[index]
 
-   if name == 'culture':
-      print('Reactor culture human-induced pluripotent stem cells - hiPSCs') 
+def _maybe_downsample(t, y, target=2000, step=False):
+   """Downsample a trajectory before plotting when it holds more than 5000 points"""
+   t = np.asarray(t); y = np.asarray(y)
+   if len(t) <= max(5000, target):
+      return t, y
+   elif step:
+      return _downsample_minmax(t, y, target)
+   else:
+      return _downsample_lttb(t, y, target)
 
-   elif name in ['broth', 'liquidphase', 'liquid-phase''media']:
+# Component names that should not appear in describe('parts')
+_component_skip = frozenset(['der', 'temp_1', 'temp_2', 'temp_3', 'temp_4', 'temp_5', 'temp_6', 'temp_7',
+                             '', 'BPL', 'Customer', 'today[1]', 'today[2]', 'today[3]'])
 
-      X = model.get('liquidphase.X')[0]; X_description = model.get_variable_description('liquidphase.X'); X_mw = model.get('liquidphase.mw[1]')[0]
-      G = model.get('liquidphase.G')[0]; G_description = model.get_variable_description('liquidphase.G'); G_mw = model.get('liquidphase.mw[2]')[0]
-      L = model.get('liquidphase.L')[0]; L_description = model.get_variable_description('liquidphase.L'); L_mw = model.get('liquidphase.mw[3]')[0]
+# Parameters of the reactor equations in the order expected by the jitted RHS
+_rhs_par_names = ['Ks', 'G_in', 'ki', 'kj', 'qLpmax', 'qm', 'Yns', 'Vcc', 'scale', 'CL0', 'OTR']
 
-      print('Reactor broth substances included in the model')
-      print()
-      print(X_description, '   index = ', X, 'molecular weight = ', X_mw, 'Da')
-      print(G_description, ' index = ', G, 'molecular weight = ', G_mw, 'Da')
-      print(L_description, ' index = ', L, 'molecular weight = ', L_mw, 'Da')
+#------------------------------------------------------------------------------------------------------------------
+#  Parallel sweep workers - module level so they can be pickled by multiprocessing
+#------------------------------------------------------------------------------------------------------------------
 
-   elif name in ['parts']:
-      describe_parts(component_list_minimum)
+_worker_model = None
+_worker_refs = None
 
-   elif name in ['MSL']:
-      describe_MSL()
+def _worker_init(fmu_model_local, parLocation_local):
+   """Load the FMU once in the worker process and resolve the parameter value references"""
+   global _worker_model, _worker_refs
+   _worker_model = load_fmu(fmu_model_local, log_level=0)
+   _worker_refs = {key: _worker_model.get_variable_valueref(parLocation_local[key])
+                   for key in parLocation_local.keys()}
 
-   else:
-      describe_general(name, decimals)
+def _worker_simulate(task):
+   """Simulate one parameter combination and return only the needed trajectories"""
+   par_values, final_time, needed_vars, options_dict = task
+   _worker_model.reset()
+   refs = np.array([_worker_refs[key] for key in par_values.keys()], dtype=np.uint32)
+   _worker_model.set_real(refs, np.fromiter(par_values.values(), dtype=np.float64))
+   options = _worker_model.simulate_options()
+   options.update(options_dict)
+   options['initialize'] = True
+   sim_res = _worker_model.simulate(final_time=final_time, options=options)
+   traj = {name: np.asarray(sim_res[name]) for name in needed_vars}
+   traj['time'] = np.asarray(sim_res['time'])
+   return traj
 
 #------------------------------------------------------------------------------------------------------------------
-#  General code 
-FMU_explore = 'FMU-explore version 1.0.0'
+#  Class STEMSession - the loaded FMU together with parameters, states, diagrams and simulation bookkeeping
 #------------------------------------------------------------------------------------------------------------------
 
-# Define function par() for parameter update
-def par(parDict=parDict, parCheck=parCheck, parLocation=parLocation, *x, **x_kwarg):
-   """ Set parameter values if available in the predefined dictionaryt parDict. """
-   x_kwarg.update(*x)
-   x_temp = {}
-   for key in x_kwarg.keys():
-      if key in parDict.keys():
-         x_temp.update({key: x_kwarg[key]})
+class STEMSession:
+   """Simulation session for the perfusion reactor with STEM culture.
+
+      The class holds what used to be module-level globals: the loaded FMU, the
+      dictionaries parDict/parLocation/stateDict, the list of plot closures
+      diagrams, and the bookkeeping needed for repeated and continued
+      simulations. The module-level functions par(), init(), simu(), newplot(),
+      show(), disp(), describe() etc wrap a default instance."""
+
+   def __init__(self):
+
+      # Provde the right FMU and load for different platforms in user dialogue:
+      self.model = None
+      if platform.system() == 'Windows':
+         print('Windows - run FMU pre-compiled JModelica 2.14')
+         self.flag_vendor = 'JM'
+         self.flag_type = 'CS'
+         self.fmu_model = 'BPL_STEM_AIR_Perfusion_windows_jm_cs.fmu'
+         self.model = load_fmu(self.fmu_model, log_level=0)
+      elif platform.system() == 'Linux':
+         self.flag_vendor = 'OM'
+         self.flag_type = 'ME'
+         print('Linux - run FMU pre-compiled OpenModelica')
+         if self.flag_type in ['CS','cs']:
+            self.fmu_model = 'BPL_STEM_AIR_Perfusion_linux_om_cs.fmu'
+            self.model = load_fmu(self.fmu_model, log_level=0)
+         if self.flag_type in ['ME','me']:
+            self.fmu_model = 'BPL_STEM_AIR_Reactor_linux_om_me.fmu'
+            self.model = load_fmu(self.fmu_model, log_level=0)
       else:
-         print('Error:', key, '- seems not an accessible parameter - check the spelling')
-   parDict.update(x_temp)
-   
-   parErrors = [requirement for requirement in parCheck if not(eval(requirement))]
-   if not parErrors == []:
-      print('Error - the following requirements do not hold:')
-      for index, item in enumerate(parErrors): print(item)
-
-# Define function init() for initial values update
-def init(parDict=parDict, *x, **x_kwarg):
-   """ Set initial values and the name should contain string '_start' to be accepted.
-       The function can handle general parameter string location names if entered as a dictionary. """
-   x_kwarg.update(*x)
-   x_init={}
-   for key in x_kwarg.keys():
-      if '_start' in key: 
-         x_init.update({key: x_kwarg[key]})
+         print('There is no FMU for this platform')
+
+      # Provide various opts-profiles
+      if self.flag_type in ['CS', 'cs']:
+         self.opts_std = self.model.simulate_options()
+         self.opts_std['silent_mode'] = True
+         self.opts_std['ncp'] = 500
+         self.opts_std['result_handling'] = 'memory' if self.opts_std['ncp'] <= 500 else 'binary'
+      elif self.flag_type in ['ME', 'me']:
+         self.opts_std = self.model.simulate_options()
+         self.opts_std["CVode_options"]["verbosity"] = 50
+         # With ncp=0 CVode returns only its accepted steps and event points instead of
+         # being forced to 500 communication points - plots are resampled afterwards
+         self.opts_std['ncp'] = 0
+         self.opts_std['CVode_options']['store_event_points'] = True
+         self.opts_std['result_handling'] = 'memory' if self.opts_std['ncp'] <= 500 else 'binary'
+         # Pin the CVode tolerances instead of the model-description default, to the same
+         # accuracy as the numba backend so the two backends give comparable trajectories
+         self.opts_std['CVode_options']['rtol'] = 1e-6
+         self.opts_std['CVode_options']['atol'] = 1e-8
       else:
-         print('Error:', key, '- seems not an initial value, use par() instead - check the spelling')
-   parDict.update(x_init)
-   
-# Define function disp() for display of initial values and parameters
-def dict_reverser(d):
-   seen = set()
-   return {v: k for k, v in d.items() if v not in seen or seen.add(v)}
-   
-def disp(name='', decimals=3, mode='short'):
-   """ Display intial values and parameters in the model that include "name" and is in parLocation list.
-       Note, it does not take the value from the dictionary par but from the model. """
-   global parLocation, model
-   
-   if mode in ['short']:
-      k = 0
-      for Location in [parLocation[k] for k in parDict.keys()]:
-         if name in Location:
-            if type(model.get(Location)[0]) != np.bool_:
-               print(dict_reverser(parLocation)[Location] , ':', np.round(model.get(Location)[0],decimals))
-            else:
-               print(dict_reverser(parLocation)[Location] , ':', model.get(Location)[0])               
+         print('There is no FMU for this platform')
+
+      # Provide various MSL and BPL versions
+      self.MSL_usage = '3.2.3 - used components: RealInput, RealOutput, CombiTimeTable, Types'
+      self.MSL_version = '3.2.3'
+      self.BPL_version = 'BPL - not used'
+
+      # Simulation time
+      self.simulationTime = 1000.0
+      self.prevFinalTime = 0
+
+      # Dictionary of time discrete states
+      self.timeDiscreteStates = {}
+
+      # Define a minimal compoent list of the model as a starting point for describe('parts')
+      self.component_list_minimum = ['bioreactor', 'bioreactor.culture']
+
+      # Define process_diagram
+      self.fmu_process_diagram = 'BPL_GUI_STEM_Perfusion_process_diagram_om.png'
+
+      # Create stateDict that later will be used to store final state and used for initialization in 'cont':
+      self.stateDict = self.model.get_states_list()
+      self.stateDict.update(self.timeDiscreteStates)
+
+      # Create parDict
+      self.parDict = {}
+      self.parDict['Vcc'] = 0.040                # L
+      self.parDict['N_start'] = 50               # 1E6
+      self.parDict['DO_start'] = 100             # mg/L
+      self.parDict['qm'] = 1.0e-6                # mg/(h*1E6)
+      self.parDict['Yns'] = 0.013                # mg/1E6
+      self.parDict['qLpmax'] = 0.008             #
+      self.parDict['scale'] = 1000.0             # Correction of L equation Vcc
+      self.parDict['CL0'] = 8.0                  # mg/L
+      self.parDict['OTR'] = 21                   # mg/h
+
+      self.parLocation = {}
+      self.parLocation['Vcc'] = 'Vcc'
+      self.parLocation['N_start'] = 'N_start'
+      self.parLocation['DO_start'] = 'DO_start'
+      self.parLocation['qm'] = 'qm'
+      self.parLocation['Yns'] = 'Yns'
+      self.parLocation['qLpmax'] = 'qLpmax'
+      self.parLocation['scale'] = 'scale'
+      self.parLocation['CL0'] = 'CL0'
+      self.parLocation['OTR'] = 'OTR'
+
+      # Parameter value check - especially for hysteresis to avoid runtime error
+      self.parCheck = []
+      # Requirements precompiled once - eval of a code object skips re-parsing the string
+      self._parCheck_code = [compile(requirement, '<parCheck>', 'eval') for requirement in self.parCheck]
+      self._parKeys = frozenset(self.parDict)
+
+      # List of plot closures to be called by simu() and the variables they need
+      self.diagrams = []
+      self._needed_vars = set()
+
+      # Rasterize lines with more points than this in vector output (PDF/SVG) - set by newplot()
+      self._rasterize_threshold = 2000
+
+      # Reverse map from model location to parDict name
+      self._locToName = dict_reverser(self.parLocation)
+
+      # Pre-computed FMI value references of parDict for batched parameter setting
+      self._par_real_keys, self._par_real_refs, self._par_bool_keys, self._par_bool_refs = \
+         self._build_par_refs()
+      self._par_seen_keys = set(self.parDict)
+
+      # Parameters of the previous simulation and whether the FMU carries its final state
+      self._parDict_prev = {}
+      self._model_has_state = False
+
+      # Mapping from state keys to start-variable value references - built on first use
+      self._state_keys = None
+      self._state_refs = None
+
+      # Caches for describe('parts') and the optional Numba backend
+      self._components_cache = None
+      self._numba_backend = None
+
+      # Cache of variable metadata (description, unit, value reference, is_real) used by
+      # describe() - pre-filled for the parDict locations, extended lazily for other names
+      self._var_meta = {}
+      for location in self.parLocation.values():
+         self._lookup_meta(location)
+
+      # Result of the latest simulation
+      self.sim_res = None
+      self.t = None
+      self._natural_steps = False
+
+      # Plot pens
+      self.setLines()
+
+   #---------------------------------------------------------------------------------------------------------------
+   #  Plotting
+   #---------------------------------------------------------------------------------------------------------------
+
+   def _rasterize(self, t):
+      """Tell whether a trajectory is dense enough that its line should be rasterized"""
+      return len(t) > self._rasterize_threshold
+
+   def _style_axes(self, axes_spec):
+      """Apply grid and labels to the axes from a list of (ax, ylabel, xlabel) tuples"""
+      for ax, ylabel, xlabel in axes_spec:
+         ax.grid()
+         ax.set(ylabel=ylabel, **({'xlabel': xlabel} if xlabel else {}))
+
+   def newplot(self, title='Stem cell perfusion cultivation', plotType='TimeSeries', rasterize_threshold=2000):
+      """ Standard plot window,
+           title = '' """
+      import matplotlib.pyplot as plt
+
+      self._rasterize_threshold = rasterize_threshold
+
+      # Reset pens
+      self.setLines()
+
+      diagrams = self.diagrams
+      rasterize = self._rasterize
+
+      # Plot diagram
+      if plotType == 'Basic':
+
+         plt.figure()
+         self.ax1 = ax1 = plt.subplot(6,1,1)
+         self.ax2 = ax2 = plt.subplot(6,1,2)
+         self.ax3 = ax3 = plt.subplot(6,1,3)
+         self.ax4 = ax4 = plt.subplot(6,1,4)
+         self.ax5 = ax5 = plt.subplot(6,1,5)
+         self.ax6 = ax6 = plt.subplot(6,1,6)
+
+         ax1.set_title(title)
+         self._style_axes([(ax1, 'N [1E6]', None),
+                           (ax2, 'G [g/L]', None),
+                           (ax3, 'L [g/L]', None),
+                           (ax4, 'DO [mg/L]', None),
+                           (ax5, 'Vcc [L]', None),
+                           (ax6, 'F [L/h]', 'Time [h]')])
+
+         # List of plot closures to be called by simu() after a simulation
+         self._needed_vars.clear()
+         self._needed_vars.update(['N', 'G', 'L', 'DO', 'Vcc', 'F'])
+         diagrams.clear()
+         diagrams.append(lambda t, sim_res, linetype, ax=ax1: ax.plot(*_maybe_downsample(t, sim_res['N']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax2: ax.plot(*_maybe_downsample(t, sim_res['G']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax2: ax.set_ylim(0))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax3: ax.plot(*_maybe_downsample(t, sim_res['L']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax4: ax.plot(*_maybe_downsample(t, sim_res['DO']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax4: ax.set_ylim(0))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax5: ax.plot(*_maybe_downsample(t, sim_res['Vcc']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax5: ax.set_ylim([0, 0.050]))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax6: ax.step(*_maybe_downsample(t, sim_res['F'], step=True), color='b', linestyle=linetype, rasterized=rasterize(t)))
+
+      elif plotType == 'Comprehensive':
+
+         plt.figure()
+         self.ax11 = ax11 = plt.subplot(5,2,1); self.ax12 = ax12 = plt.subplot(5,2,2)
+         self.ax21 = ax21 = plt.subplot(5,2,3); self.ax22 = ax22 = plt.subplot(5,2,4)
+         self.ax31 = ax31 = plt.subplot(5,2,5); self.ax32 = ax32 = plt.subplot(5,2,6)
+         self.ax41 = ax41 = plt.subplot(5,2,7); self.ax42 = ax42 = plt.subplot(5,2,8)
+         self.ax51 = ax51 = plt.subplot(5,2,9); self.ax52 = ax52 = plt.subplot(5,2,10)
+
+         ax11.set_title(title)
+         self._style_axes([(ax11, 'N [1E6]', None),
+                           (ax21, 'G [g/L]', None),
+                           (ax31, 'L [g/L]', None),
+                           (ax41, 'DO [mg/L]', None),
+                           (ax51, 'F [L/h]', 'Time [h]'),
+                           (ax12, 'qN [1/h]', None),
+                           (ax22, 'qG [g/(h*1E6)]', None),
+                           (ax32, 'qL [g/(h*1E6)]', None),
+                           (ax42, 'qO2 [mg/(h*1E6)]', None),
+                           (ax52, 'OUR [mg/h]', 'Time [h]')])
+
+         # List of plot closures to be called by simu() after a simulation
+         self._needed_vars.clear()
+         self._needed_vars.update(['N', 'G', 'L', 'DO', 'F', 'qN', 'qNmax', 'qG', 'qLp', 'qLc', 'qO2'])
+         diagrams.clear()
+         diagrams.append(lambda t, sim_res, linetype, ax=ax11: ax.plot(*_maybe_downsample(t, sim_res['N']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax21: ax.plot(*_maybe_downsample(t, sim_res['G']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax21: ax.set_ylim(0))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax31: ax.plot(*_maybe_downsample(t, sim_res['L']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax41: ax.plot(*_maybe_downsample(t, sim_res['DO']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax41: ax.set_ylim(0))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax51: ax.step(*_maybe_downsample(t, sim_res['F'], step=True), color='b', linestyle=linetype, rasterized=rasterize(t)))
+
+         diagrams.append(lambda t, sim_res, linetype, ax=ax12: ax.plot(*_maybe_downsample(t, sim_res['qN']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax12: ax.step(*_maybe_downsample(t, sim_res['qNmax'], step=True), color='r', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax22: ax.plot(*_maybe_downsample(t, sim_res['qG']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax32: ax.plot(*_maybe_downsample(t, sim_res['qL_net']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax32: ax.plot(*_maybe_downsample(t, sim_res['qLp']), color='g', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax32: ax.step(*_maybe_downsample(t, sim_res['qLc'], step=True), color='r', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax42: ax.step(*_maybe_downsample(t, sim_res['qO2'], step=True), color='r', linestyle=linetype, rasterized=rasterize(t)))
+         diagrams.append(lambda t, sim_res, linetype, ax=ax52: ax.plot(*_maybe_downsample(t, sim_res['OUR']), color='b', linestyle=linetype, rasterized=rasterize(t)))
+
+   def setLines(self, lines=['-','--',':','-.']):
+      """Set list of linetypes used in plots and restart the plot counter"""
+      self._lines = lines
+      self._plot_call_count = 0
+
+   def _next_linetype(self):
+      """Linetype for the next plotted simulation - cycles deterministically over the pens"""
+      linetype = self._lines[self._plot_call_count % len(self._lines)]
+      self._plot_call_count += 1
+      return linetype
+
+   def _extract_trajectories(self, sim_res):
+      """Read each trajectory needed by the diagrams once from the result handler into plain ndarrays"""
+      traj = {name: np.asarray(sim_res[name]) for name in self._needed_vars}
+      # Derived series for the Comprehensive diagrams - computed once with vectorized NumPy
+      if 'qLp' in traj and 'qLc' in traj:
+         traj['qL_net'] = traj['qLp'] - traj['qLc']
+      if 'N' in traj and 'qO2' in traj:
+         traj['OUR'] = traj['N']*traj['qO2']
+      return traj
+
+   def _resample(self, traj, t, n=500):
+      """Resample trajectories from the solver's natural output points onto a uniform
+         time grid with n intervals - cheaper than forcing dense communication points"""
+      tu = np.linspace(t[0], t[-1], n+1)
+      return tu, {name: np.interp(tu, t, y) for name, y in traj.items()}
+
+   def _plot_data(self):
+      """Time vector and trajectories of the last simulation, plot-ready"""
+      t = np.asarray(self.sim_res['time'])
+      traj = self._extract_trajectories(self.sim_res)
+      if self._natural_steps:
+         t, traj = self._resample(traj, t)
+      return t, traj
+
+   def show(self):
+      """Show diagrams chosen by newplot()"""
+      # Plot pen
+      linetype = self._next_linetype()
+      # Plot diagrams
+      t, traj = self._plot_data()
+      for diagram in self.diagrams: diagram(t, traj, linetype)
+
+   #---------------------------------------------------------------------------------------------------------------
+   #  Parameters and initial values
+   #---------------------------------------------------------------------------------------------------------------
+
+   def par(self, *x, **x_kwarg):
+      """ Set parameter values if available in the predefined dictionaryt parDict. """
+      parDict = self.parDict
+      x_kwarg.update(*x)
+      if len(self._parKeys) != len(parDict):
+         self._parKeys = frozenset(parDict)
+      x_temp = {}
+      for key in x_kwarg.keys():
+         if key in self._parKeys:
+            x_temp.update({key: x_kwarg[key]})
          else:
-            k = k+1
-      if k == len(parLocation):
-         for parName in parDict.keys():
-            if name in parName:
-               if type(model.get(Location)[0]) != np.bool_:
-                  print(parName,':', np.round(model.get(parLocation[parName])[0],decimals))
-               else: 
-                  print(parName,':', model.get(parLocation[parName])[0])
-   if mode in ['long','location']:
-      k = 0
-      for Location in [parLocation[k] for k in parDict.keys()]:
-         if name in Location:
-            if type(model.get(Location)[0]) != np.bool_:       
-               print(Location,':', dict_reverser(parLocation)[Location] , ':', np.round(model.get(Location)[0],decimals))
+            print('Error:', key, '- seems not an accessible parameter - check the spelling')
+      parDict.update(x_temp)
+
+      # Requirements appended to parCheck at runtime are compiled here on demand
+      if len(self.parCheck) != len(self._parCheck_code):
+         self._parCheck_code = [compile(requirement, '<parCheck>', 'eval') for requirement in self.parCheck]
+      parErrors = [requirement for requirement, code in zip(self.parCheck, self._parCheck_code)
+                   if not(eval(code))]
+      if not parErrors == []:
+         print('Error - the following requirements do not hold:')
+         for index, item in enumerate(parErrors): print(item)
+
+   def init(self, *x, **x_kwarg):
+      """ Set initial values and the name should contain string '_start' to be accepted.
+          The function can handle general parameter string location names if entered as a dictionary. """
+      x_kwarg.update(*x)
+      x_init={}
+      for key in x_kwarg.keys():
+         if '_start' in key:
+            x_init.update({key: x_kwarg[key]})
          else:
-            k = k+1
-      if k == len(parLocation):
+            print('Error:', key, '- seems not an initial value, use par() instead - check the spelling')
+      self.parDict.update(x_init)
+
+   def disp(self, name='', decimals=3, mode='short'):
+      """ Display intial values and parameters in the model that include "name" and is in parLocation list.
+          Note, it does not take the value from the dictionary par but from the model. """
+      parDict = self.parDict; parLocation = self.parLocation; _locToName = self._locToName
+
+      # One batched FMI crossing for the real parameters, name-based get for the boolean ones
+      values = dict(zip(self._par_real_keys, self.model.get_real(self._par_real_refs)))
+      values.update({key: self.model.get(parLocation[key])[0] for key in self._par_bool_keys})
+
+      if mode in ['short']:
+         matched = False
+         for parName in parDict.keys():
+            if name in parLocation[parName]:
+               matched = True
+               if type(values[parName]) != np.bool_:
+                  print(_locToName[parLocation[parName]], ':', np.round(values[parName], decimals))
+               else:
+                  print(_locToName[parLocation[parName]], ':', values[parName])
+         if not matched:
+            for parName in parDict.keys():
+               if name in parName:
+                  if type(values[parName]) != np.bool_:
+                     print(parName, ':', np.round(values[parName], decimals))
+                  else:
+                     print(parName, ':', values[parName])
+      if mode in ['long','location']:
+         matched = False
          for parName in parDict.keys():
-            if name in parName:
-               if type(model.get(Location)[0]) != np.bool_:
-                  print(parLocation[parName], ':', dict_reverser(parLocation)[Location], ':', parName,':', 
-                     np.round(model.get(parLocation[parName])[0],decimals))
+            if name in parLocation[parName]:
+               matched = True
+               if type(values[parName]) != np.bool_:
+                  print(parLocation[parName], ':', _locToName[parLocation[parName]], ':', np.round(values[parName], decimals))
+         if not matched:
+            for parName in parDict.keys():
+               if name in parName:
+                  if type(values[parName]) != np.bool_:
+                     print(parLocation[parName], ':', _locToName[parLocation[parName]], ':', parName, ':',
+                        np.round(values[parName], decimals))
 
-# Line types
-def setLines(lines=['-','--',':','-.']):
-   """Set list of linetypes used in plots"""
-   global linecycler
-   linecycler = cycle(lines)
+   def _build_par_refs(self):
+      """Resolve the FMI value references of parDict once, split into real and boolean parameters"""
+      real_keys = []; real_refs = []
+      bool_keys = []; bool_refs = []
+      for key in self.parDict.keys():
+         if type(self.parDict[key]) == bool:
+            bool_keys.append(key)
+            bool_refs.append(self.model.get_variable_valueref(self.parLocation[key]))
+         else:
+            real_keys.append(key)
+            real_refs.append(self.model.get_variable_valueref(self.parLocation[key]))
+      return real_keys, np.array(real_refs, dtype=np.uint32), bool_keys, np.array(bool_refs, dtype=np.uint32)
 
-# Show plots from sim_res, just that
-def show(diagrams=diagrams):
-   """Show diagrams chosen by newplot()"""
-   # Plot pen
-   linetype = next(linecycler)    
-   # Plot diagrams 
-   for command in diagrams: eval(command)
-
-# Simulation
-def simu(simulationTimeLocal=simulationTime, mode='Initial', options=opts_std, \
-         diagrams=diagrams,timeDiscreteStates=timeDiscreteStates):         
-   """Model loaded and given intial values and parameter before,
-      and plot window also setup before."""
-    
-   # Global variables
-   global model, parDict, stateDict, prevFinalTime, simulationTime, sim_res, t
-   
-   # Simulation flag
-   simulationDone = False
-   
-   # Transfer of argument to global variable
-   simulationTime = simulationTimeLocal 
-      
-   # Check parDict
-   value_missing = 0
-   for key in parDict.keys():
-      if parDict[key] in [np.nan, None, '']:
-         print('Value missing:', key)
-         value_missing =+1
-   if value_missing>0: return
-         
-   # Load model
-   if model is None:
-      model = load_fmu(fmu_model) 
-   model.reset()
-      
-   # Run simulation
-   if mode in ['Initial', 'initial', 'init']:
-      # Set parameters and intial state values:
-      for key in parDict.keys():
-         model.set(parLocation[key],parDict[key])   
-      # Simulate
-      sim_res = model.simulate(final_time=simulationTime, options=options)  
-      simulationDone = True
-   elif mode in ['Continued', 'continued', 'cont']:
-
-      if prevFinalTime == 0: 
-         print("Error: Simulation is first done with default mode = init'")      
+   def _refresh_par_refs(self):
+      """Resolve value references for parameters added to parDict after setup, eg by init()"""
+      for key in self.parDict.keys():
+         if key not in self._par_seen_keys:
+            self._par_seen_keys.add(key)
+            try:
+               vref = self.model.get_variable_valueref(self.parLocation.get(key, key))
+            except FMUException:
+               print('Error:', key, '- seems not an accessible parameter - check the spelling')
+               continue
+            if type(self.parDict[key]) == bool:
+               self._par_bool_keys.append(key)
+               self._par_bool_refs = np.append(self._par_bool_refs, np.uint32(vref))
+            else:
+               self._par_real_keys.append(key)
+               self._par_real_refs = np.append(self._par_real_refs, np.uint32(vref))
+
+   def _set_parameters(self, keys=None):
+      """Push parDict values to the model in one set_real() call (and one set_boolean() if needed).
+         If keys is given then only those parameters are set."""
+      if len(self._par_seen_keys) != len(self.parDict):
+         self._refresh_par_refs()
+      if keys is None:
+         real_keys = self._par_real_keys; real_refs = self._par_real_refs
+         bool_keys = self._par_bool_keys; bool_refs = self._par_bool_refs
       else:
-         
-         # Set parameters and intial state values:
-         for key in parDict.keys():
-            model.set(parLocation[key],parDict[key])                
-
-         for key in stateDict.keys():
-            if not key[-1] == ']':
-               if key[-3:] == 'I.y': 
-                  model.set(key[:-10]+'I_start', stateDict[key]) 
-               elif key[-3:] == 'D.x': 
-                  model.set(key[:-10]+'D_start', stateDict[key]) 
-               else:
-                  model.set(key+'_start', stateDict[key])
-            elif key[-3] == '[':
-               model.set(key[:-3]+'_start'+key[-3:], stateDict[key]) 
-            elif key[-4] == '[':
-               model.set(key[:-4]+'_start'+key[-4:], stateDict[key]) 
-            elif key[-5] == '[':
-               model.set(key[:-5]+'_start'+key[-5:], stateDict[key]) 
+         keys = set(keys)
+         index = [i for i, key in enumerate(self._par_real_keys) if key in keys]
+         real_keys = [self._par_real_keys[i] for i in index]; real_refs = self._par_real_refs[index]
+         index = [i for i, key in enumerate(self._par_bool_keys) if key in keys]
+         bool_keys = [self._par_bool_keys[i] for i in index]; bool_refs = self._par_bool_refs[index]
+      if len(real_keys) > 0:
+         self.model.set_real(real_refs, np.fromiter((self.parDict[key] for key in real_keys), dtype=np.float64))
+      if len(bool_keys) > 0:
+         self.model.set_boolean(bool_refs, [self.parDict[key] for key in bool_keys])
+
+   def _build_state_map(self):
+      """Apply the state-to-start-name rules once and resolve the start-variable value references"""
+      state_keys = []; start_refs = []
+      for key in self.stateDict.keys():
+         if not key[-1] == ']':
+            if key[-3:] == 'I.y':
+               start_name = key[:-10]+'I_start'
+            elif key[-3:] == 'D.x':
+               start_name = key[:-10]+'D_start'
             else:
-               print('The state vecotr has more than 1000 states')
-               break
+               start_name = key+'_start'
+         elif key[-3] == '[':
+            start_name = key[:-3]+'_start'+key[-3:]
+         elif key[-4] == '[':
+            start_name = key[:-4]+'_start'+key[-4:]
+         elif key[-5] == '[':
+            start_name = key[:-5]+'_start'+key[-5:]
+         else:
+            print('The state vecotr has more than 1000 states')
+            continue
+         try:
+            vref = self.model.get_variable_valueref(start_name)
+         except FMUException:
+            # No start parameter in the FMU, eg a state with initial="exact" - setting the
+            # state variable itself before initialization works just as well then
+            try:
+               vref = self.model.get_variable_valueref(key)
+            except FMUException:
+               print('Warning:', key, '- no start variable found and the state is not restored')
+               continue
+         state_keys.append(key)
+         start_refs.append(vref)
+      self._state_keys = state_keys
+      self._state_refs = np.array(start_refs, dtype=np.uint32)
+
+   def _set_state_start_values(self):
+      """Push all stateDict values to the start variables in one set_real() call"""
+      if self._state_keys is None:
+         self._build_state_map()
+      self.model.set_real(self._state_refs,
+                          np.fromiter((self.stateDict[key] for key in self._state_keys), dtype=np.float64))
+
+   #---------------------------------------------------------------------------------------------------------------
+   #  Simulation
+   #---------------------------------------------------------------------------------------------------------------
 
+   def simu(self, simulationTimeLocal=None, mode='Initial', options=None, backend='fmu'):
+      """Model loaded and given intial values and parameter before,
+         and plot window also setup before.
+         With backend='numba' the reactor equations are instead integrated by
+         scipy.integrate.solve_ivp with a Numba-jitted RHS (requires numba and scipy)."""
+
+      if options is None:
+         options = self.opts_std
+      else:
+         # pyfmi accepts a partial dict of overrides - work on a copy so that setting
+         # 'initialize' below does not mutate the caller's dict
+         options = dict(options)
+
+      # Simulation flag
+      simulationDone = False
+
+      # Transfer of argument to session state
+      if simulationTimeLocal is not None:
+         self.simulationTime = simulationTimeLocal
+      simulationTime = self.simulationTime
+
+      # Check parDict
+      value_missing = 0
+      for key in self.parDict.keys():
+         if self.parDict[key] in [np.nan, None, '']:
+            print('Value missing:', key)
+            value_missing =+1
+      if value_missing>0: return
+
+      # Load model
+      if self.model is None:
+         self.model = load_fmu(self.fmu_model)
+         self._model_has_state = False
+      model = self.model
+
+      # Run simulation
+      if backend in ['numba', 'Numba']:
+         try:
+            if mode in ['Initial', 'initial', 'init']:
+               self.sim_res = self._simulate_numba(0, simulationTime, options)
+            elif mode in ['Continued', 'continued', 'cont']:
+               if self.prevFinalTime == 0:
+                  print("Error: Simulation is first done with default mode = init'")
+                  self.sim_res = None
+               else:
+                  self.sim_res = self._simulate_numba(self.prevFinalTime,
+                                                      self.prevFinalTime + simulationTime, options)
+            else:
+               print("Simulation mode not correct")
+               self.sim_res = None
+         except ImportError:
+            print('Error: numba and scipy are needed for backend=numba - use the default FMU backend')
+            self.sim_res = None
+         simulationDone = self.sim_res is not None
+      elif mode in ['Initial', 'initial', 'init']:
+         # Reset model and set parameters:
+         model.reset()
+         self._set_parameters()
+         options['initialize'] = True
          # Simulate
-         sim_res = model.simulate(start_time=prevFinalTime,
-                                 final_time=prevFinalTime + simulationTime,
-                                 options=options) 
-         simulationDone = True             
-   else:
-      print("Simulation mode not correct")
+         self.sim_res = model.simulate(final_time=simulationTime, options=options)
+         simulationDone = True
+      elif mode in ['Continued', 'continued', 'cont']:
 
-   if simulationDone:
-    
-      # Extract data
-      t = sim_res['time']
- 
-      # Plot diagrams
-      linetype = next(linecycler)    
-      for command in diagrams: eval(command)
-            
-      # Store final state values stateDict:
-      for key in list(stateDict.keys()): stateDict[key] = model.get(key)[0]        
-
-      # Store time from where simulation will start next time
-      prevFinalTime = model.time
-   
-   else:
-      print('Error: No simulation done')
-      
-# Describe model parts of the combined system
-def describe_parts(component_list=[]):
-   """List all parts of the model""" 
-       
-   def model_component(variable_name):
-      i = 0
-      name = ''
-      finished = False
-      if not variable_name[0] == '_':
-         while not finished:
-            name = name + variable_name[i]
-            if i == len(variable_name)-1:
-                finished = True 
-            elif variable_name[i+1] in ['.', '(']: 
-                finished = True
-            else: 
-                i=i+1
-      if name in ['der', 'temp_1', 'temp_2', 'temp_3', 'temp_4', 'temp_5', 'temp_6', 'temp_7']: name = ''
-      return name
-    
-   variables = list(model.get_model_variables().keys())
-        
-   for i in range(len(variables)):
-      component = model_component(variables[i])
-      if (component not in component_list) \
-      & (component not in ['','BPL', 'Customer', 'today[1]', 'today[2]', 'today[3]', 'temp_2', 'temp_3']):
-         component_list.append(component)
-      
-   print(sorted(component_list, key=str.casefold))
-   
-def describe_MSL(flag_vendor=flag_vendor):
-   """List MSL version and components used"""
-   print('MSL:', MSL_usage)
- 
-# Describe parameters and variables in the Modelica code
-def describe_general(name, decimals):
-  
-   if name == 'time':
-      description = 'Time'
-      unit = 'h'
-      print(description,'[',unit,']')
-      
-   elif name in parLocation.keys():
-      description = model.get_variable_description(parLocation[name])
-      value = model.get(parLocation[name])[0]
-      try:
-         unit = model.get_variable_unit(parLocation[name])
-      except FMUException:
-         unit =''
-      if unit =='':
-         if type(value) != np.bool_:
-            print(description, ':', np.round(value, decimals))
+         if self.prevFinalTime == 0:
+            print("Error: Simulation is first done with default mode = init'")
          else:
-            print(description, ':', value)            
+
+            if self._model_has_state:
+               # The FMU still carries the final state of the previous simulation - skip reset
+               # and re-initialization and only push the parameters changed since then:
+               changed = [key for key in self.parDict.keys()
+                          if self.parDict[key] != self._parDict_prev.get(key)]
+               if not changed == []: self._set_parameters(changed)
+               options['initialize'] = False
+            else:
+               # Re-initialize from stateDict - set parameters and intial state values:
+               model.reset()
+               self._set_parameters()
+               self._set_state_start_values()
+               options['initialize'] = True
+
+            # Simulate
+            self.sim_res = model.simulate(start_time=self.prevFinalTime,
+                                          final_time=self.prevFinalTime + simulationTime,
+                                          options=options)
+            simulationDone = True
       else:
-        print(description, ':', np.round(value, decimals), '[',unit,']')
-                  
-   else:
-      description = model.get_variable_description(name)
-      value = model.get(name)[0]
+         print("Simulation mode not correct")
+
+      if simulationDone:
+
+         # Extract data - resample when CVode ran with ncp=0 and gave its natural steps
+         self._natural_steps = backend not in ['numba', 'Numba'] and \
+            options.get('ncp', self.opts_std['ncp']) == 0
+         t, traj = self._plot_data()
+         self.t = t
+
+         # Plot diagrams
+         linetype = self._next_linetype()
+         for diagram in self.diagrams: diagram(t, traj, linetype)
+
+         if backend in ['numba', 'Numba']:
+            # Store final state values and time - the FMU itself has not advanced, so a
+            # following simu(mode='cont') re-initializes the FMU from stateDict
+            for key in list(self.stateDict.keys()):
+               if key in self.sim_res:
+                  self.stateDict[key] = self.sim_res[key][-1]
+               else:
+                  print('Warning:', key, '- state not in the numba trajectories and kept its old value')
+            self.prevFinalTime = t[-1]
+            self._model_has_state = False
+         else:
+            # Store final state values stateDict:
+            for key in list(self.stateDict.keys()): self.stateDict[key] = model.get(key)[0]
+
+            # Store time from where simulation will start next time
+            self.prevFinalTime = model.time
+
+            # The FMU now carries the final state and the parameters of this simulation
+            self._parDict_prev = self.parDict.copy()
+            self._model_has_state = True
+
+      else:
+         print('Error: No simulation done')
+
+   def save_checkpoint(self, path='BPL_STEM_AIR_Perfusion_checkpoint.h5'):
+      """Save stateDict, parDict and the simulation time to an HDF5 file,
+         so that a long exploratory session can be restarted after a crashed kernel"""
+      if self.prevFinalTime == 0:
+         print('Error: No simulation to checkpoint yet - run simu() first')
+         return
       try:
-         unit = model.get_variable_unit(name)
-      except FMUException:
-         unit =''
+         import h5py
+      except ImportError:
+         print('Error: h5py is needed for checkpointing - pip install h5py')
+         return
+      with h5py.File(path, 'w') as checkpoint:
+         state = checkpoint.create_dataset('stateDict',
+            data=np.fromiter((self.stateDict[key] for key in self.stateDict.keys()), dtype=np.float64))
+         state.attrs['names'] = list(self.stateDict.keys())
+         pars = checkpoint.create_group('parDict')
+         for key in self.parDict.keys(): pars.attrs[key] = self.parDict[key]
+         checkpoint.attrs['prevFinalTime'] = self.prevFinalTime
+         checkpoint.attrs['FMU_explore'] = FMU_explore
+      print('Checkpoint saved to', path)
+
+   def load_checkpoint(self, path='BPL_STEM_AIR_Perfusion_checkpoint.h5'):
+      """Load stateDict, parDict and the simulation time from an HDF5 checkpoint.
+         The next simu(mode='cont') re-initializes the FMU from the restored state
+         through the batched start-value setting."""
+      try:
+         import h5py
+      except ImportError:
+         print('Error: h5py is needed for checkpointing - pip install h5py')
+         return
+      with h5py.File(path, 'r') as checkpoint:
+         state = checkpoint['stateDict']
+         for key, value in zip(state.attrs['names'], state[...]):
+            self.stateDict[key] = float(value)
+         for key in checkpoint['parDict'].attrs.keys():
+            self.parDict[key] = checkpoint['parDict'].attrs[key]
+         self.prevFinalTime = float(checkpoint.attrs['prevFinalTime'])
+      # The FMU does not carry this state - force re-initialization from stateDict in cont mode
+      self._model_has_state = False
+      print('Checkpoint loaded from', path)
+
+   def sweep(self, par_grid, simulationTimeLocal=None, max_workers=None, options=None):
+      """Simulate a list of parameter combinations in parallel and return the trajectories.
+         Each entry of par_grid is a dict of parDict overrides, eg sweep([{'OTR':v} for v in [15,18,21]]),
+         and the result is a list of dicts of trajectories in the same order as par_grid.
+         The FMU is loaded once per worker process and then reused over the grid."""
+      import concurrent.futures
+
+      if options is None: options = self.opts_std
+      final_time = self.simulationTime if simulationTimeLocal is None else simulationTimeLocal
+      needed_vars = self._needed_vars if len(self._needed_vars) > 0 else {'N', 'G', 'L', 'DO', 'Vcc', 'F'}
+
+      for overrides in par_grid:
+         for key in overrides.keys():
+            if key not in self.parDict.keys():
+               print('Error:', key, '- seems not an accessible parameter - check the spelling')
+               return
+
+      tasks = [({**self.parDict, **overrides}, final_time, set(needed_vars), dict(options))
+               for overrides in par_grid]
+      with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_worker_init,
+                                                  initargs=(self.fmu_model, dict(self.parLocation))) as pool:
+         return list(pool.map(_worker_simulate, tasks))
+
+   #---------------------------------------------------------------------------------------------------------------
+   #  Optional Numba/SciPy backend with the reactor equations in Python form. The equations
+   #  mirror the Modelica code of the Reactor model: Monod-type growth limited by glucose and
+   #  inhibited by cell density, lactate production/consumption, and oxygen balance over Vcc,
+   #  with F, qNmax, qLc and qO2 scheduled by the CombiTimeTable 'data' in the model.
+   #---------------------------------------------------------------------------------------------------------------
+
+   def _setup_numba_backend(self):
+      """Read the scheduling table from the FMU and JIT-compile the reactor equations"""
+      from numba import njit
+
+      # Scheduling table of the CombiTimeTable: time, F, qNmax, qLc, qO2, G_measured
+      # The glob also matches data.tableName and data.tableOnFile - keep the elements only
+      table_names = [name for name in self.model.get_model_variables(filter='data.table*').keys()
+                     if '[' in name]
+      rows = max(int(name.split('[')[1].split(',')[0]) for name in table_names)
+      cols = max(int(name.split(',')[1].split(']')[0]) for name in table_names)
+      table = np.empty((rows, cols))
+      for i in range(rows):
+         for j in range(cols):
+            table[i,j] = self.model.get('data.table['+str(i+1)+','+str(j+1)+']')[0]
+      # Modelica.Blocks.Types.Smoothness.LinearSegments = 1, otherwise hold previous value
+      linear = self.model.get('data.smoothness')[0] == 1
+
+      @njit(cache=True, fastmath=True)
+      def lookup(tq, tt, vv, linear):
+         if linear:
+            return np.interp(tq, tt, vv)
+         i = np.searchsorted(tt, tq, side='right') - 1
+         if i < 0: i = 0
+         elif i > len(tt)-1: i = len(tt)-1
+         return vv[i]
+
+      @njit(cache=True, fastmath=True)
+      def stem_rhs(t, y, p, tt, tv, linear):
+         N = y[0]; G = y[1]; L = y[2]; DO = y[3]
+         Ks = p[0]; G_in = p[1]; ki = p[2]; kj = p[3]; qLpmax = p[4]; qm = p[5]
+         Yns = p[6]; Vcc = p[7]; scale = p[8]; CL0 = p[9]; OTR = p[10]
+         F = lookup(t, tt, tv[:,0], linear)
+         qNmax = lookup(t, tt, tv[:,1], linear)
+         qLc = lookup(t, tt, tv[:,2], linear)
+         qO2 = lookup(t, tt, tv[:,3], linear)
+         qN = qNmax*ki*G/((G + Ks)*(ki + N))
+         qG = qN*Yns + qm
+         qLp = qLpmax*kj/(kj + L)
+         dN = qN*N
+         dG = (F*(G_in - G) - qG*N)/(scale*Vcc)
+         dL = ((qLp - qLc)*N - F*L)/(scale*Vcc)
+         dDO = (OTR + F*CL0 - qO2*N)/(scale*Vcc)
+         return np.array([dN, dG, dL, dDO])
+
+      self._numba_backend = {'rhs': stem_rhs, 'table': table, 'linear': linear}
+
+   def _simulate_numba(self, start_time, final_time, options):
+      """Simulate with the jitted reactor equations and return a dict of trajectories"""
+      from scipy.integrate import solve_ivp
+
+      if self._numba_backend is None:
+         self._setup_numba_backend()
+      rhs = self._numba_backend['rhs']; table = self._numba_backend['table']
+      linear = self._numba_backend['linear']
+      tt = table[:,0]; tv = table[:,1:]
+
+      # Parameter vector - parDict values where available, model defaults otherwise
+      p = np.array([self.parDict[self._locToName[name]] if name in self._locToName
+                    else self.model.get(name)[0] for name in _rhs_par_names])
+
+      # Initial state - start values for a fresh simulation, stateDict when continuing
+      if start_time == 0:
+         y0 = np.array([self.parDict.get('N_start', self.model.get('N_start')[0]),
+                        self.model.get('G_start')[0], 0.0,
+                        self.parDict.get('DO_start', self.model.get('DO_start')[0])])
+      else:
+         y0 = np.array([self.stateDict['N'], self.stateDict['G'],
+                        self.stateDict['L'], self.stateDict['DO']])
+
+      ncp = options['ncp'] if options['ncp'] > 0 else 500
+      sol = solve_ivp(rhs, (start_time, final_time), y0, method='LSODA',
+                      t_eval=np.linspace(start_time, final_time, ncp+1),
+                      args=(p, tt, tv, linear), rtol=1e-6, atol=1e-8)
+      if not sol.success:
+         print('Error:', sol.message)
+         return None
+
+      # Recompute the algebraic variables over the trajectory with vectorized NumPy
+      t = sol.t; N = sol.y[0]; G = sol.y[1]; L = sol.y[2]; DO = sol.y[3]
+      if linear:
+         F, qNmax, qLc, qO2 = (np.interp(t, tt, tv[:,j]) for j in range(4))
+      else:
+         index = np.clip(np.searchsorted(tt, t, side='right') - 1, 0, len(tt)-1)
+         F, qNmax, qLc, qO2 = (tv[index,j] for j in range(4))
+      qN = qNmax*p[2]*G/((G + p[0])*(p[2] + N))
+      return {'time': t, 'N': N, 'G': G, 'L': L, 'DO': DO,
+              'Vcc': np.full_like(t, p[7]), 'F': F,
+              'qN': qN, 'qNmax': qNmax, 'qG': qN*p[6] + p[5],
+              'qLp': p[4]*p[3]/(p[3] + L), 'qLc': qLc, 'qO2': qO2}
+
+   #---------------------------------------------------------------------------------------------------------------
+   #  Describe the model and the framework
+   #---------------------------------------------------------------------------------------------------------------
+
+   def describe(self, name, decimals=3):
+      """Look up description of culture, media, as well as parameters and variables in the model code"""
+
+      if name == 'culture':
+         print('Reactor culture human-induced pluripotent stem cells - hiPSCs')
+
+      elif name in ['broth', 'liquidphase', 'liquid-phase''media']:
+
+         model = self.model
+         X = model.get('liquidphase.X')[0]; X_description = model.get_variable_description('liquidphase.X'); X_mw = model.get('liquidphase.mw[1]')[0]
+         G = model.get('liquidphase.G')[0]; G_description = model.get_variable_description('liquidphase.G'); G_mw = model.get('liquidphase.mw[2]')[0]
+         L = model.get('liquidphase.L')[0]; L_description = model.get_variable_description('liquidphase.L'); L_mw = model.get('liquidphase.mw[3]')[0]
+
+         print('Reactor broth substances included in the model')
+         print()
+         print(X_description, '   index = ', X, 'molecular weight = ', X_mw, 'Da')
+         print(G_description, ' index = ', G, 'molecular weight = ', G_mw, 'Da')
+         print(L_description, ' index = ', L, 'molecular weight = ', L_mw, 'Da')
+
+      elif name in ['parts']:
+         self.describe_parts(self.component_list_minimum)
+
+      elif name in ['MSL']:
+         self.describe_MSL()
+
+      else:
+         self.describe_general(name, decimals)
+
+   def describe_parts(self, component_list=[]):
+      """List all parts of the model"""
+
+      def model_component(variable_name):
+         if variable_name[0] == '_': return ''
+         name = variable_name.split('.', 1)[0].split('(', 1)[0]
+         return '' if name in _component_skip else name
+
+      # Only the model-variable scan is cached - the caller's seed list is merged in per call
+      if self._components_cache is None:
+         components = set()
+         for variable_name in self.model.get_model_variables().keys():
+            component = model_component(variable_name)
+            if component not in _component_skip:
+               components.add(component)
+         self._components_cache = components
+
+      print(sorted(self._components_cache | set(component_list), key=str.casefold))
+
+   def describe_MSL(self):
+      """List MSL version and components used"""
+      print('MSL:', self.MSL_usage)
+
+   def _lookup_meta(self, location):
+      """Cached lookup of (description, unit, value reference, is_real) for a model variable"""
+      meta = self._var_meta.get(location)
+      if meta is None:
+         description = self.model.get_variable_description(location)
+         try:
+            unit = self.model.get_variable_unit(location)
+         except FMUException:
+            unit = ''
+         vref = self.model.get_variable_valueref(location)
+         # Value references are per-type in FMI - only Real variables may use the get_real fast path
+         is_real = isinstance(self.model.get(location)[0], (float, np.floating))
+         meta = (description, unit, vref, is_real)
+         self._var_meta[location] = meta
+      return meta
+
+   def describe_general(self, name, decimals):
+      """Describe parameters and variables in the Modelica code"""
+
+      if name == 'time':
+         description = 'Time'
+         unit = 'h'
+         print(description,'[',unit,']')
+         return
+
+      location = self.parLocation[name] if name in self.parLocation.keys() else name
+      description, unit, vref, is_real = self._lookup_meta(location)
+      if is_real:
+         value = self.model.get_real(np.array([vref], dtype=np.uint32))[0]
+      else:
+         value = self.model.get(location)[0]
       if unit =='':
          if type(value) != np.bool_:
             print(description, ':', np.round(value, decimals))
          else:
-            print(description, ':', value)     
+            print(description, ':', value)
       else:
          print(description, ':', np.round(value, decimals), '[',unit,']')
-         
-# Plot process diagram
-def process_diagram(fmu_model=fmu_model, fmu_process_diagram=fmu_process_diagram):   
-   try:
-       process_diagram = zipfile.ZipFile(fmu_model, 'r').open('documentation/processDiagram.png')
-   except KeyError:
-       print('No processDiagram.png file in the FMU, but try the file on disk.')
-       process_diagram = fmu_process_diagram
-   try:
-       plt.imshow(img.imread(process_diagram))
-       plt.axis('off')
-       plt.show()
-   except FileNotFoundError:
-       print('And no such file on disk either')
-         
-# Describe framework
+
+   def process_diagram(self):
+      """Plot process diagram"""
+      import zipfile
+      import matplotlib.pyplot as plt
+      import matplotlib.image as img
+      try:
+          process_diagram = zipfile.ZipFile(self.fmu_model, 'r').open('documentation/processDiagram.png')
+      except KeyError:
+          print('No processDiagram.png file in the FMU, but try the file on disk.')
+          process_diagram = self.fmu_process_diagram
+      try:
+          plt.imshow(img.imread(process_diagram))
+          plt.axis('off')
+          plt.show()
+      except FileNotFoundError:
+          print('And no such file on disk either')
+
+   def BPL_info(self):
+      print()
+      print('Model for bioreactor has been setup. Key commands:')
+      print(' - par()       - change of parameters and initial values')
+      print(' - init()      - change initial values only')
+      print(' - simu()      - simulate and plot')
+      print(' - newplot()   - make a new plot')
+      print(' - show()      - show plot from previous simulation')
+      print(' - disp()      - display parameters and initial values from the last simulation')
+      print(' - describe()  - describe culture, broth, parameters, variables with values/units')
+      print()
+      print('Note that both disp() and describe() takes values from the last simulation')
+      print('and the command process_diagram() brings up the main configuration')
+      print()
+      print('Brief information about a command by help(), eg help(simu)')
+      print('Key system information is listed with the command system_info()')
+
+   def system_info(self):
+      """Print system information"""
+      model = self.model
+      FMU_type = model.__class__.__name__
+      print()
+      print('System information')
+      print(' -OS:', platform.system())
+      print(' -Python:', platform.python_version())
+      try:
+          scipy_ver = scipy.__version__
+          print(' -Scipy:',scipy_ver)
+      except NameError:
+          print(' -Scipy: not installed in the notebook')
+      print(' -PyFMI:', version('pyfmi'))
+      print(' -FMU by:', model.get_generation_tool())
+      print(' -FMI:', model.get_version())
+      print(' -Type:', FMU_type)
+      print(' -Name:', model.get_name())
+      print(' -Generated:', model.get_generation_date_and_time())
+      print(' -MSL:', self.MSL_version)
+      print(' -Description:', self.BPL_version)
+      print(' -Interaction:', FMU_explore)
+
+#------------------------------------------------------------------------------------------------------------------
+#  Default session and module-level functions kept for backward compatibility
+#------------------------------------------------------------------------------------------------------------------
+
+session = STEMSession()
+
+# Module-level names that earlier were globals - they refer to the default session
+fmu_model = session.fmu_model
+model = session.model
+flag_vendor = session.flag_vendor
+flag_type = session.flag_type
+opts_std = session.opts_std
+MSL_usage = session.MSL_usage
+MSL_version = session.MSL_version
+BPL_version = session.BPL_version
+simulationTime = session.simulationTime
+prevFinalTime = session.prevFinalTime
+timeDiscreteStates = session.timeDiscreteStates
+component_list_minimum = session.component_list_minimum
+fmu_process_diagram = session.fmu_process_diagram
+stateDict = session.stateDict
+parDict = session.parDict
+parLocation = session.parLocation
+parCheck = session.parCheck
+diagrams = session.diagrams
+
+def newplot(title='Stem cell perfusion cultivation', plotType='TimeSeries', rasterize_threshold=2000):
+   """ Standard plot window,
+        title = '' """
+   global ax1, ax2, ax3, ax4, ax5, ax6
+   global ax11, ax12, ax21, ax22, ax31, ax32, ax41, ax42, ax51, ax52
+   result = session.newplot(title, plotType, rasterize_threshold)
+   if plotType == 'Basic':
+      ax1 = session.ax1; ax2 = session.ax2; ax3 = session.ax3
+      ax4 = session.ax4; ax5 = session.ax5; ax6 = session.ax6
+   elif plotType == 'Comprehensive':
+      ax11 = session.ax11; ax12 = session.ax12; ax21 = session.ax21; ax22 = session.ax22
+      ax31 = session.ax31; ax32 = session.ax32; ax41 = session.ax41; ax42 = session.ax42
+      ax51 = session.ax51; ax52 = session.ax52
+   return result
+
+def describe(name, decimals=3):
+   """Look up description of culture, media, as well as parameters and variables in the model code"""
+   return session.describe(name, decimals)
+
+def par(*x, **x_kwarg):
+   """ Set parameter values if available in the predefined dictionaryt parDict. """
+   return session.par(*x, **x_kwarg)
+
+def init(*x, **x_kwarg):
+   """ Set initial values and the name should contain string '_start' to be accepted.
+       The function can handle general parameter string location names if entered as a dictionary. """
+   return session.init(*x, **x_kwarg)
+
+def disp(name='', decimals=3, mode='short'):
+   """ Display intial values and parameters in the model that include "name" and is in parLocation list. """
+   return session.disp(name, decimals, mode)
+
+def setLines(lines=['-','--',':','-.']):
+   """Set list of linetypes used in plots"""
+   return session.setLines(lines)
+
+def show():
+   """Show diagrams chosen by newplot()"""
+   return session.show()
+
+def simu(simulationTimeLocal=None, mode='Initial', options=None, backend='fmu'):
+   """Simulate and plot - see STEMSession.simu"""
+   global sim_res, t, simulationTime, prevFinalTime
+   result = session.simu(simulationTimeLocal, mode, options, backend)
+   sim_res = session.sim_res; t = session.t
+   simulationTime = session.simulationTime; prevFinalTime = session.prevFinalTime
+   return result
+
+def save_checkpoint(path='BPL_STEM_AIR_Perfusion_checkpoint.h5'):
+   """Save stateDict, parDict and the simulation time to an HDF5 file for restart"""
+   return session.save_checkpoint(path)
+
+def load_checkpoint(path='BPL_STEM_AIR_Perfusion_checkpoint.h5'):
+   """Load stateDict, parDict and the simulation time from an HDF5 checkpoint"""
+   global prevFinalTime
+   result = session.load_checkpoint(path)
+   prevFinalTime = session.prevFinalTime
+   return result
+
+def sweep(par_grid, simulationTimeLocal=None, max_workers=None, options=None):
+   """Simulate a list of parameter combinations in parallel - see STEMSession.sweep"""
+   return session.sweep(par_grid, simulationTimeLocal, max_workers, options)
+
+def describe_parts(component_list=[]):
+   """List all parts of the model"""
+   return session.describe_parts(component_list)
+
+def describe_MSL():
+   """List MSL version and components used"""
+   return session.describe_MSL()
+
+def describe_general(name, decimals):
+   return session.describe_general(name, decimals)
+
+def process_diagram():
+   """Plot process diagram"""
+   return session.process_diagram()
+
 def BPL_info():
-   print()
-   print('Model for bioreactor has been setup. Key commands:')
-   print(' - par()       - change of parameters and initial values')
-   print(' - init()      - change initial values only')
-   print(' - simu()      - simulate and plot')
-   print(' - newplot()   - make a new plot')
-   print(' - show()      - show plot from previous simulation')
-   print(' - disp()      - display parameters and initial values from the last simulation')
-   print(' - describe()  - describe culture, broth, parameters, variables with values/units')
-   print()
-   print('Note that both disp() and describe() takes values from the last simulation')
-   print('and the command process_diagram() brings up the main configuration')
-   print()
-   print('Brief information about a command by help(), eg help(simu)') 
-   print('Key system information is listed with the command system_info()')
+   return session.BPL_info()
 
 def system_info():
    """Print system information"""
-   FMU_type = model.__class__.__name__
-   print()
-   print('System information')
-   print(' -OS:', platform.system())
-   print(' -Python:', platform.python_version())
-   try:
-       scipy_ver = scipy.__version__
-       print(' -Scipy:',scipy_ver)
-   except NameError:
-       print(' -Scipy: not installed in the notebook')
-   print(' -PyFMI:', version('pyfmi'))
-   print(' -FMU by:', model.get_generation_tool())
-   print(' -FMI:', model.get_version())
-   print(' -Type:', FMU_type)
-   print(' -Name:', model.get_name())
-   print(' -Generated:', model.get_generation_date_and_time())
-   print(' -MSL:', MSL_version)    
-   print(' -Description:', BPL_version)   
-   print(' -Interaction:', FMU_explore)
-   
+   return session.system_info()
+
 #------------------------------------------------------------------------------------------------------------------
 #  Startup
 #------------------------------------------------------------------------------------------------------------------
 
-BPL_info()
\ No newline at end of file
+BPL_info()